@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
+from datetime import datetime
 from enum import Enum
-from typing import Any, List, Optional, NamedTuple
+from typing import Any, Optional, NamedTuple, Tuple
 
 import numpy as np
 from adafruit_blinka.microcontroller.bcm283x.pin import Pin  # type: ignore # noqa
@@ -16,43 +16,71 @@ LuxReading = NamedTuple('LuxReading', [
 
 
 class LuxAggregator(object):
-
-    def __init__(self) -> None:
-        self._luxes: List[LuxReading] = []
+    """Accumulates lux readings to average them.
+
+    The int fields of the readings are stored in a numpy array, one row per reading, and the
+    timestamps in a parallel datetime64 array, so each is averaged in a single reduction. The
+    arrays double when full and are kept across clears, so once they've grown to fit the readings
+    between clears, adding a reading doesn't allocate.
+    """
+    __slots__ = ('_values', '_timestamps', '_n')
+
+    # The number of int fields in a LuxReading, which precede the timestamp.
+    NUM_INT_FIELDS = 5
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY) -> None:
+        assert capacity > 0, "Capacity must be positive"
+        self._values = np.empty((capacity, LuxAggregator.NUM_INT_FIELDS), dtype=np.int64)
+        self._timestamps = np.empty(capacity, dtype='datetime64[us]')
+        # The number of readings added.
+        self._n = 0
 
     def add(self, lux: LuxReading) -> None:
-        self._luxes.append(lux)
+        n = self._n
+        if n == len(self._timestamps):
+            # Out of room, so double the capacity.
+            self._values = np.concatenate((self._values, np.empty_like(self._values)))
+            self._timestamps = np.concatenate((self._timestamps, np.empty_like(self._timestamps)))
+        self._values[n] = (lux.outer, lux.inner, lux.avg, lux.diff, lux.diff_percent)
+        self._timestamps[n] = lux.timestamp
+        self._n = n + 1
 
     def average(self) -> LuxReading:
-        return LuxReading(
-            self._int_avg('outer'),
-            self._int_avg('inner'),
-            self._int_avg('avg'),
-            self._int_avg('diff'),
-            self._int_avg('diff_percent'),
-            self._timestamp_avg())
+        # Truncate the means like int() would, and convert back to python ints.
+        outer, inner, avg, diff, diff_percent = (
+                self._values[:self._n].mean(axis=0).astype(np.int64).tolist())
+        return LuxReading(outer, inner, avg, diff, diff_percent, self._timestamp_avg())
 
     def clear(self) -> None:
-        self._luxes.clear()
-
-    def _int_avg(self, field: str) -> int:
-        field_values = [getattr(lux, field) for lux in self._luxes]
-        assert all(type(val) is int for val in field_values)
-        return int(np.mean(field_values))
+        # Keep the allocated arrays for reuse.
+        self._n = 0
 
     def _timestamp_avg(self) -> datetime:
-        dates = [lux.timestamp for lux in self._luxes]
-        ref_date = datetime(1900, 1, 1)
-        return ref_date + sum([date - ref_date for date in dates], timedelta()) / len(dates)
+        # Average the timestamps as int64 microseconds since the epoch.
+        mean_us = int(self._timestamps[:self._n].view(np.int64).mean())
+        return np.datetime64(mean_us, 'us').astype(datetime)
 
     def __len__(self) -> int:
-        return len(self._luxes)
+        return self._n
 
 
-def get_diff_percent(outer: int, inner: int) -> int:
-    avg = int(np.mean((outer, inner)))
+def get_lux_stats(outer: int, inner: int) -> Tuple[int, int, int]:
+    """Derives the (avg, diff, diff_percent) of a lux reading, using only int arithmetic.
+
+    This runs on every sensor read, so it avoids the overhead of numpy for two values.
+    """
+    # Lux values are non-negative, so floor division truncates like int(mean) would.
+    avg = (outer + inner) // 2
     diff = inner - outer
-    return int(diff/avg * 100) if avg else 0
+    # Truncate towards zero, like int(diff/avg * 100).
+    diff_percent = abs(diff) * 100 // avg if avg else 0
+    return avg, diff, diff_percent if diff >= 0 else -diff_percent
+
+
+def get_diff_percent(outer: int, inner: int) -> int:
+    """Returns how much brighter inner is than outer, as a percent of their average."""
+    return get_lux_stats(outer, inner)[2]
 
 
 class Region(Enum):
@@ -75,16 +103,20 @@ class Rotation(Enum):
 
 class Direction(Enum):
     """The relative direction of travel."""
-    OUTER = -1
-    INNER = +1
+    # Each member also carries its motor rotation and the edge it travels towards, so these are
+    # plain attribute lookups in the movement loops.
+    motor_rotation: Rotation
+    extreme_edge: Region
 
-    @property
-    def motor_rotation(self) -> Rotation:
-        return Rotation.CCW if self is Direction.OUTER else Rotation.CW
+    OUTER = (-1, Rotation.CCW, Region.OUTER_EDGE)
+    INNER = (+1, Rotation.CW, Region.INNER_EDGE)
 
-    @property
-    def extreme_edge(self) -> Region:
-        return Region.OUTER_EDGE if self is Direction.OUTER else Region.INNER_EDGE
+    def __new__(cls, value: int, motor_rotation: Rotation, extreme_edge: Region) -> 'Direction':
+        direction = object.__new__(cls)
+        direction._value_ = value
+        direction.motor_rotation = motor_rotation
+        direction.extreme_edge = extreme_edge
+        return direction
 
 
 Status = NamedTuple('Status', [
@@ -93,6 +125,9 @@ Status = NamedTuple('Status', [
 
 
 class Component(ABC):
+    # Empty slots, so subclasses can declare their own fixed attributes.
+    __slots__ = ()
+
     @abstractmethod
     def setup(self) -> None:
         pass
@@ -103,12 +138,16 @@ class Component(ABC):
 
 
 class Output(Component):
+    __slots__ = ()
+
     @abstractmethod
     def output_status(self, status: Status) -> None:
         pass
 
 
 class Input(Component):
+    __slots__ = ()
+
     @abstractmethod
     def read(self) -> Any:
         pass
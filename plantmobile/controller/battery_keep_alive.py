@@ -6,10 +6,17 @@ from .controller import Controller
 from plantmobile.common import Status
 from plantmobile.platform_driver import MobilePlatform
 
+_log = logging.getLogger(__name__)
+
 
 class BatteryKeepAlive(Controller):
     # TODO: assert that voltage increased?
 
+    __slots__ = (
+        'platform', 'ping_interval_secs', 'ping_duration_secs', 'enabled',
+        '_ping_interval_ns', '_next_ping_ns',
+    )
+
     def __init__(self,
                  platform: MobilePlatform,
                  ping_interval_secs: float,
@@ -21,19 +28,22 @@ class BatteryKeepAlive(Controller):
         self.ping_interval_secs = ping_interval_secs
         self.ping_duration_secs = ping_duration_secs
         self.enabled = enabled
-        self._last_ping = float("-inf")
+        # Tracked in integer nanoseconds on the monotonic clock, so clock adjustments don't skew it.
+        self._ping_interval_ns = int(ping_interval_secs * 1e9)
+        # When the next ping is due, so each check is a single comparison. Zero means right away.
+        self._next_ping_ns = 0
 
     def perform_action(self, status: Status) -> bool:
         if not self.enabled():
-            # Reset the counter so it will attempt to ping when enabled.
-            self._last_ping = float("-inf")
+            # Reset the deadline so it will attempt to ping when enabled.
+            self._next_ping_ns = 0
             return False
 
-        now = time.time()
-        if now - self._last_ping > self.ping_interval_secs:
-            logging.info("%d seconds elapsed: running keepalive ping for %.1f seconds",
-                         self.ping_interval_secs, self.ping_duration_secs)
-            self._last_ping = now
+        now_ns = time.monotonic_ns()
+        if now_ns >= self._next_ping_ns:
+            _log.info("%d seconds elapsed: running keepalive ping for %.1f seconds",
+                      self.ping_interval_secs, self.ping_duration_secs)
+            self._next_ping_ns = now_ns + self._ping_interval_ns
             self.platform.ping_motor(status, self.ping_duration_secs)
             return True
         return False
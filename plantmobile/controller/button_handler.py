@@ -1,13 +1,44 @@
 import logging
+import threading
+import time
+from enum import Enum
 from typing import Callable, Optional
 
-from .controller import Controller
+from .controller import Controller, MOVE_PRINT_INTERVAL_SECS
 from plantmobile.common import Direction, Status
 from plantmobile.debug_panel import DebugPanel
 from plantmobile.input_device import Button
 from plantmobile.logger import StatusPrinter
 from plantmobile.platform_driver import MobilePlatform
 
+_log = logging.getLogger(__name__)
+
+
+class ButtonPress(Enum):
+    """The combination of directional buttons currently pressed."""
+    # Each member also carries the direction it commands, if any, so a press maps to a move with
+    # a single attribute lookup.
+    direction: Optional[Direction]
+
+    NONE = (0, None)
+    INNER = (1, Direction.INNER)
+    OUTER = (2, Direction.OUTER)
+    BOTH = (3, None)
+
+    def __new__(cls, value: int, direction: Optional[Direction]) -> 'ButtonPress':
+        press = object.__new__(cls)
+        press._value_ = value
+        press.direction = direction
+        return press
+
+    @classmethod
+    def from_buttons(cls, outer_pressed: bool, inner_pressed: bool) -> 'ButtonPress':
+        return _BUTTON_PRESSES[outer_pressed << 1 | inner_pressed]
+
+
+# Button presses indexed by (outer_pressed << 1 | inner_pressed).
+_BUTTON_PRESSES = (ButtonPress.NONE, ButtonPress.INNER, ButtonPress.OUTER, ButtonPress.BOTH)
+
 
 class ButtonHandler(Controller):
     """Controller for the mobile platform via two buttons.
@@ -16,37 +47,60 @@ class ButtonHandler(Controller):
     In press mode, press one of the buttons and it will move until it reaches an edge.
     """
 
+    __slots__ = (
+        'platform', 'debug_panel', 'status_printer', 'outer_button', 'inner_button', '_wake',
+        '_cancel', '_hold_mode', '_direction_commanded', '_outer_pressed', '_inner_pressed',
+        '_continue_checkers', '_last_move_print_time',
+    )
+
     def __init__(self,
                  platform: MobilePlatform,
                  debug_panel: DebugPanel,
                  status_printer: StatusPrinter,
                  outer_button: Button,
                  inner_button: Button,
-                 hold_button_threshold_secs: float = 0.1) -> None:
+                 hold_button_threshold_secs: float = 0.1,
+                 wake: Optional[threading.Event] = None) -> None:
         self.platform = platform
         self.debug_panel = debug_panel
         self.status_printer = status_printer
+        self.outer_button = outer_button
+        self.inner_button = inner_button
+        # The button states as of their last edge callbacks, to avoid re-reading the pins. Seeded
+        # from the pins before the callbacks are attached, in case a button is already held.
+        self._outer_pressed = bool(outer_button.is_pressed)
+        self._inner_pressed = bool(inner_button.is_pressed)
         for button in (outer_button, inner_button):
             button.when_pressed = self._on_press
             button.when_held = self._on_hold
             button.when_released = self._on_release
             button.hold_time = hold_button_threshold_secs
-        self.outer_button = outer_button
-        self.inner_button = inner_button
+        # Set when a move is commanded, to wake the control loop.
+        self._wake = wake
+        # Set when a command is cancelled, to stop an in-progress move.
+        self._cancel = threading.Event()
         # In hold mode, hold the button down for movement.
         self._hold_mode = False
         self._direction_commanded: Optional[Direction] = None
-        self._i = 0
+        # Build the move callbacks up front, rather than a new closure for every move.
+        self._continue_checkers = {
+                direction: self._should_continue(direction) for direction in Direction}
+        self._last_move_print_time = float("-inf")
 
     def _on_press(self, button: Button) -> None:
         # This logic controller the non-hold mode.
-        logging.debug("Button press: %s", button)
-
-        if self.outer_button.is_pressed and self.inner_button.is_pressed:
-            # Both are pressed.
-            self._direction_commanded = None
+        # The callbacks run on every edge, so only build debug messages when they'll be logged.
+        debug = _log.isEnabledFor(logging.DEBUG)
+        if debug:
+            _log.debug("Button press: %s", button)
+        self._set_pressed(button, True)
+
+        press = self._button_press()
+        if press is ButtonPress.BOTH:
+            self._cancel_command()
             self.toggle_hold_mode()
-            logging.debug("Both buttons pressed: toggling hold mode to %s", self._hold_mode)
+            if debug:
+                _log.debug("Both buttons pressed: toggling hold mode to %s", self._hold_mode)
             return
         if self._hold_mode:
             # Hold mode commands are handled by _on_hold.
@@ -54,32 +108,60 @@ class ButtonHandler(Controller):
 
         if self._direction_commanded:
             # Any button press cancels an in-progress move.
-            logging.debug("Cancelling in-progress command %s (press)", self._direction_commanded)
-            self._direction_commanded = None
-        else:
-            self._direction_commanded = self._corresponding_direction(button)
-            logging.debug("Commanding move in direction %s (press)", self._direction_commanded)
+            if debug:
+                _log.debug("Cancelling in-progress command %s (press)", self._direction_commanded)
+            self._cancel_command()
+        elif press.direction:
+            self._command(press.direction)
+            if debug:
+                _log.debug("Commanding move in direction %s (press)", self._direction_commanded)
 
     def _on_hold(self, button: Button) -> None:
-        logging.debug("Button hold: %s", button)
+        debug = _log.isEnabledFor(logging.DEBUG)
+        if debug:
+            _log.debug("Button hold: %s", button)
         if not self._hold_mode:
             # Press mode commands are handled by _on_press.
             return
 
-        if self.outer_button.is_pressed and self.inner_button.is_pressed:
-            logging.debug("Both buttons held: doing nothing")
+        press = self._button_press()
+        if press is ButtonPress.BOTH:
+            if debug:
+                _log.debug("Both buttons held: doing nothing")
+            return
+        if press.direction is None:
+            # Released before the hold callback ran.
             return
 
-        self._direction_commanded = self._corresponding_direction(button)
-        logging.debug("Commanding move in direction %s (hold)", self._direction_commanded)
+        self._command(press.direction)
+        if debug:
+            _log.debug("Commanding move in direction %s (hold)", self._direction_commanded)
 
     def _on_release(self, button: Button) -> None:
+        self._set_pressed(button, False)
         if self._hold_mode:
-            logging.debug("Button %s no longer held down. Cancelling movement", button)
-            self._direction_commanded = None
+            if _log.isEnabledFor(logging.DEBUG):
+                _log.debug("Button %s no longer held down. Cancelling movement", button)
+            self._cancel_command()
+
+    def _command(self, direction: Direction) -> None:
+        self._direction_commanded = direction
+        if self._wake:
+            self._wake.set()
+
+    def _set_pressed(self, button: Button, pressed: bool) -> None:
+        if button is self.inner_button:
+            self._inner_pressed = pressed
+        else:
+            self._outer_pressed = pressed
+
+    def _cancel_command(self) -> None:
+        self._direction_commanded = None
+        # Stops the motor directly, rather than waiting for the move to poll should_continue.
+        self._cancel.set()
 
-    def _corresponding_direction(self, button: Button) -> Direction:
-        return Direction.INNER if button is self.inner_button else Direction.OUTER
+    def _button_press(self) -> ButtonPress:
+        return ButtonPress.from_buttons(self._outer_pressed, self._inner_pressed)
 
     def toggle_hold_mode(self) -> None:
         """Toggle between hold mode and press mode."""
@@ -89,9 +171,10 @@ class ButtonHandler(Controller):
     def _should_continue(self, direction_commanded: Direction) -> Callable[[Status], bool]:
         def should_continue(status: Status) -> bool:
             self.debug_panel.output_status(status)
-            if self._i % 10 == 0:
+            now = time.monotonic()
+            if now - self._last_move_print_time >= MOVE_PRINT_INTERVAL_SECS:
                 self.status_printer.output_status(status, force=True)
-            self._i += 1
+                self._last_move_print_time = now
             return self._direction_commanded is direction_commanded
         return should_continue
 
@@ -99,8 +182,10 @@ class ButtonHandler(Controller):
         direction = self._direction_commanded
         if direction:
             try:
-                self._i = 0
-                self.platform.move_direction(direction, self._should_continue(direction))
+                self._last_move_print_time = float("-inf")
+                self._cancel.clear()
+                self.platform.move_direction(
+                        direction, self._continue_checkers[direction], cancel=self._cancel)
                 return True
             finally:
                 # Clear the command if move_direction finished without cancellation.
@@ -1,17 +1,28 @@
 import logging
+import threading
 import time
 from abc import ABC, abstractmethod
-from typing import List, NoReturn
+from typing import List, NoReturn, Optional
 
 from plantmobile.common import Status
 from plantmobile.debug_panel import DebugPanel
-from plantmobile.logger import StatusPrinter
+from plantmobile.logger import lux_band, StatusPrinter
 from plantmobile.platform_driver import BatteryError, MobilePlatform
 
+_log = logging.getLogger(__name__)
+
 CONTROL_LOOP_SLEEP_SECS = 0.5
+# While idle, the control loop period grows by this much per idle iteration...
+CONTROL_LOOP_IDLE_BACKOFF_SECS = 0.05
+# ...up to this period.
+CONTROL_LOOP_MAX_SLEEP_SECS = 2.0
+# How often the status is printed while a controller is moving the platform.
+MOVE_PRINT_INTERVAL_SECS = 0.5
 
 
 class Controller(ABC):
+    # Empty slots, so subclasses can declare their own fixed attributes.
+    __slots__ = ()
 
     @abstractmethod
     def perform_action(self, status: Status) -> bool:
@@ -26,7 +37,8 @@ def control_loop(
         platform: MobilePlatform,
         debug_panel: DebugPanel,
         status_printer: StatusPrinter,
-        controllers: List[Controller]) -> NoReturn:
+        controllers: List[Controller],
+        wake: Optional[threading.Event] = None) -> NoReturn:
     """Runs the control loop for a platform.
 
     In each loop, the controllers will be run in order until one performs an action.
@@ -35,20 +47,60 @@ def control_loop(
         The platform to drive.
     param controllers:
         The prioritized list of controllers.
+    param wake:
+        An event set by input handlers (e.g. button presses) to run the next iteration immediately
+        rather than waiting out the rest of the sleep.
+
+    The loop runs every CONTROL_LOOP_SLEEP_SECS while active, and slows down towards
+    CONTROL_LOOP_MAX_SLEEP_SECS while no action is performed and the light level is steady.
     """
+    # Run on a fixed cadence, regardless of how long each iteration takes.
+    next_deadline = time.monotonic() + CONTROL_LOOP_SLEEP_SECS
+    idle_iterations = 0
+    last_lux_band = None
+    # Resolve each controller's bound method once, rather than on every iteration.
+    actions = tuple((controller, controller.perform_action) for controller in controllers)
     while True:
         status = platform.get_status()
         debug_panel.output_status(status)
         status_printer.output_status(status)
 
         # TODO: refactor in terms of steps/changes?
+        acted = False
         try:
-            for controller in controllers:
-                if controller.perform_action(status):
-                    logging.debug("Performed action from %s", controller)
+            for controller, perform_action in actions:
+                if perform_action(status):
+                    if _log.isEnabledFor(logging.DEBUG):
+                        _log.debug("Performed action from %s", controller)
+                    acted = True
                     break
         except BatteryError:
-            logging.warning("insufficient battery voltage: is the power bank enabled?")
+            _log.warning("insufficient battery voltage: is the power bank enabled?")
             debug_panel.output_error("BATT")
 
-        time.sleep(CONTROL_LOOP_SLEEP_SECS)
+        cur_lux_band = lux_band(status.lux.avg)
+        if acted or cur_lux_band != last_lux_band:
+            idle_iterations = 0
+        else:
+            idle_iterations += 1
+        last_lux_band = cur_lux_band
+        period = min(CONTROL_LOOP_SLEEP_SECS + CONTROL_LOOP_IDLE_BACKOFF_SECS * idle_iterations,
+                     CONTROL_LOOP_MAX_SLEEP_SECS)
+
+        sleep_secs = next_deadline - time.monotonic()
+        if sleep_secs > 0:
+            if wake is not None and wake.wait(sleep_secs):
+                # Woken early by an input, so restart the active cadence from now.
+                wake.clear()
+                idle_iterations = 0
+                next_deadline = time.monotonic() + CONTROL_LOOP_SLEEP_SECS
+            else:
+                if wake is None:
+                    time.sleep(sleep_secs)
+                next_deadline += period
+        else:
+            # The iteration overran (e.g. it performed a move), so restart the cadence from now
+            # rather than running back-to-back iterations to catch up.
+            if not acted:
+                _log.warning("control loop overran by %.3fs", -sleep_secs)
+            next_deadline = time.monotonic() + period
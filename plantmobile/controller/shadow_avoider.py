@@ -1,10 +1,10 @@
 import logging
 import time
 from enum import Enum
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 
-from .controller import Controller
+from .controller import Controller, MOVE_PRINT_INTERVAL_SECS
 from plantmobile.common import (
         Direction, get_diff_percent, LuxAggregator, LuxReading, Region, Status,
 )
@@ -14,6 +14,8 @@ from plantmobile.logger import StatusPrinter
 from plantmobile.output_device import Tune
 from plantmobile.platform_driver import MobilePlatform
 
+_log = logging.getLogger(__name__)
+
 
 # Tune for "Here Comes the Sun" by The Beatles.
 AUTO_MOVE_TUNE = Tune(["F#5", "D5", "E5", "F#5"], [1, 1, 1, 2])
@@ -27,8 +29,44 @@ class LightLevel(Enum):
     INNER_BRIGHTER = 4
 
 
+# Light levels below the active threshold.
+LOW_LIGHT_LEVELS = (LightLevel.DARK, LightLevel.DIM)
+
+
+def _build_level_moves() -> Dict[Tuple[Optional[LightLevel], LightLevel], Tuple[Direction, str]]:
+    """Maps each (previous, new) light level transition to the move it calls for, if any."""
+    moves = {}
+    for prev_level in (None, *LightLevel):
+        # When dark, keep at inner edge to avoid the blinds.
+        moves[prev_level, LightLevel.DARK] = (
+                Direction.INNER, "Light dimming below active threshold")
+        # Move in the direction of the the brighter light.
+        moves[prev_level, LightLevel.OUTER_BRIGHTER] = (Direction.OUTER, "Light difference found")
+        moves[prev_level, LightLevel.INNER_BRIGHTER] = (Direction.INNER, "Light difference found")
+        if prev_level is LightLevel.INNER_BRIGHTER:
+            # When inner is no longer brighter, the shadow is likely passing the outer edge.
+            moves[prev_level, LightLevel.BRIGHT] = (
+                    Direction.OUTER, "Inner light no longer brighter")
+        elif prev_level in LOW_LIGHT_LEVELS:
+            # When no longer dim (blinds are opened), move to outer edge for more sunlight.
+            moves[prev_level, LightLevel.BRIGHT] = (
+                    Direction.OUTER, "Light rising to active threshold")
+        # When DIM, do nothing, to allow a buffer for light fluctuating back down without thrashing.
+    return moves
+
+
+# The move for each light level transition, so a run is a single lookup.
+LEVEL_MOVES = _build_level_moves()
+
+
 class ShadowAvoider(Controller):
 
+    __slots__ = (
+        'platform', 'debug_panel', 'status_printer', '_enable_button', 'diff_percent_cutoff',
+        'dim_lux_threshold', 'bright_lux_threshold', '_prev_level', '_run_interval_secs',
+        '_last_run_time', '_lux_agg', '_last_move_print_time',
+    )
+
     def __init__(
             self,
             platform: MobilePlatform,
@@ -53,7 +91,7 @@ class ShadowAvoider(Controller):
         self._run_interval_secs = run_interval_secs
         self._last_run_time = float("-inf")
         self._lux_agg = LuxAggregator()
-        self._i = 0
+        self._last_move_print_time = float("-inf")
 
     def _lux_compare(self, lux: LuxReading) -> LightLevel:
         intensity = max(lux.outer, lux.inner)
@@ -83,9 +121,10 @@ class ShadowAvoider(Controller):
     def _should_continue(self, status: Status) -> bool:
         # Output any status updates.
         self.debug_panel.output_status(status)
-        if self._i % 10 == 0:
+        now = time.monotonic()
+        if now - self._last_move_print_time >= MOVE_PRINT_INTERVAL_SECS:
             self.status_printer.output_status(status, force=True)
-        self._i += 1
+            self._last_move_print_time = now
         return self.enabled()
 
     def _move(
@@ -96,20 +135,19 @@ class ShadowAvoider(Controller):
             reason: str,
             steps: Optional[int] = None) -> int:
 
-        if ((direction is Direction.OUTER and region == Region.OUTER_EDGE)
-                or (direction is Direction.INNER and region == Region.INNER_EDGE)):
+        if region is direction.extreme_edge:
             # Don't try to move if we're already at the corresponding edge.
-            logging.info("Not moving to %s: already at edge", direction)
+            _log.info("Not moving to %s: already at edge", direction)
             return 0
 
-        logging.info("Ran analysis on lux %s", lux)
-        logging.info("%s: moving to %s edge", reason, direction)
+        _log.info("Ran analysis on lux %s", lux)
+        _log.info("%s: moving to %s edge", reason, direction)
 
         if direction is Direction.INNER:
             assert region, "Region must be initialized to automatically move towards inner"
 
         self._notify()
-        self._i = 0
+        self._last_move_print_time = float("-inf")
         steps = self.platform.move_direction(direction, self._should_continue, steps)
 
         # If we moved, reset the prev light level since the reading is for the old position.
@@ -122,7 +160,7 @@ class ShadowAvoider(Controller):
 
         # TODO: consider doing a running aggregation for a consistent time response time.
         # NOTE: this would also fix the issue with ignoring time spent on button handler.
-        if time.time() - self._last_run_time < self._run_interval_secs:
+        if time.monotonic() - self._last_run_time < self._run_interval_secs:
             return False
 
         # Get the average lux over the configured aggregation interval.
@@ -131,7 +169,7 @@ class ShadowAvoider(Controller):
         try:
             return self._perform_action(agg_lux, status.region)
         finally:
-            self._last_run_time = time.time()
+            self._last_run_time = time.monotonic()
 
     def _perform_action(self, lux: LuxReading, cur_region: Region) -> bool:
         if not self.enabled():
@@ -153,31 +191,17 @@ class ShadowAvoider(Controller):
                 self._move(Direction.INNER, new_status.region, lux, reason, steps)
             return True
 
-        logging.debug("Running light analysis with averaged lux: %s", lux)
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug("Running light analysis with averaged lux: %s", lux)
         prev_level = self._prev_level
         light_level = self._prev_level = self._lux_compare(lux)
         if prev_level == light_level:
             # Light level is effectively unchanged.
             return False
 
-        logging.info("Prev light level: %s, New light level: %s", prev_level, light_level)
-        if light_level is LightLevel.DARK:
-            # When dark, keep at inner edge to avoid the blinds.
-            self._move(Direction.INNER, cur_region, lux, "Light dimming below active threshold")
-        elif light_level is LightLevel.OUTER_BRIGHTER:
-            # Move in the direction of the the brighter light.
-            self._move(Direction.OUTER, cur_region, lux, "Light difference found")
-        elif light_level is LightLevel.INNER_BRIGHTER:
-            # Move in the direction of the the brighter light.
-            self._move(Direction.INNER, cur_region, lux, "Light difference found")
-        elif light_level is LightLevel.BRIGHT:
-            if prev_level is LightLevel.INNER_BRIGHTER:
-                # When inner is no longer brighter, the shadow is likely passing the outer edge.
-                self._move(Direction.OUTER, cur_region, lux, "Inner light no longer brighter")
-            elif prev_level in (LightLevel.DARK, LightLevel.DIM):
-                # When no longer dim (blinds are opened), move to outer edge for more sunlight.
-                self._move(Direction.OUTER, cur_region, lux, "Light rising to active threshold")
-        else:
-            assert light_level is LightLevel.DIM
-            # Do nothing, to allow a buffer for light fluctuating back down without thrashing.
+        _log.info("Prev light level: %s, New light level: %s", prev_level, light_level)
+        move = LEVEL_MOVES.get((prev_level, light_level))
+        if move is not None:
+            direction, reason = move
+            self._move(direction, cur_region, lux, reason)
         return True
@@ -1,29 +1,52 @@
+import logging
+import queue
+import threading
 import time
-from typing import Callable, Optional, no_type_check
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional, Tuple, no_type_check
 
 from plantmobile.common import Output, Status
-from plantmobile.logger import StatusPrinter
 from plantmobile.output_device import TonalBuzzer, DirectionalLeds, PositionDisplay
 
+_log = logging.getLogger(__name__)
+
 # The tone to buzz on motor error.
 ERROR_TONE_HZ = 220
 
 
 class DebugPanel(Output):
-    def __init__(self, *outputs: Output, buzzer: Optional[TonalBuzzer] = None) -> None:
+    def __init__(self, *outputs: Output, buzzer: Optional[TonalBuzzer] = None,
+                 executor: Optional[ThreadPoolExecutor] = None) -> None:
         self.outputs = outputs
         self.buzzer = buzzer
-
-        self.direction_leds = None
-        self.position_display = None
-        self.status_printer = None
-        for output in outputs:
-            if isinstance(output, PositionDisplay):
-                self.position_display = output
-            elif isinstance(output, DirectionalLeds):
-                self.direction_leds = output
-            elif isinstance(output, StatusPrinter):
-                self.status_printer = output
+        # An optional thread pool shared with other components, used instead of creating one.
+        self.executor = executor
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # The outputs used for errors and blinking. Any number of each may be configured.
+        self.position_displays = tuple(o for o in outputs if isinstance(o, PositionDisplay))
+        self.direction_leds = tuple(o for o in outputs if isinstance(o, DirectionalLeds))
+        # Serializes writes to the directional LEDs, which the blink thread also drives, so their
+        # change-only caches stay in sync with the pins. Also guards the two fields below.
+        self._led_lock = threading.Lock()
+        # Whether a blink is queued or running. Status updates to the LEDs are held back meanwhile,
+        # so they don't cut the blink short.
+        self._blinking = False
+        # The latest status for the LEDs, replayed once a blink has finished.
+        self._led_status: Optional[Status] = None
+        # Held while outputting a status, so a finished blink can't be marked as overwritten
+        # before an in-flight status is recorded.
+        self._status_lock = threading.Lock()
+        # Bound methods of the outputs, resolved once rather than on every update.
+        self._output_fns = tuple(
+                partial(self._output_leds, o.output_status) if isinstance(o, DirectionalLeds)
+                else o.output_status for o in outputs)
+        self._off_fns = tuple(o.off for o in outputs)
+        # The last status output, to skip re-outputting an unchanged one (e.g. a cached status).
+        self._last_status: Optional[Status] = None
+        # Pending (times, pause_secs) blink requests, run in order by the blink thread.
+        self._blinks: "queue.Queue[Optional[Tuple[int, float]]]" = queue.Queue()
+        self._blink_thread: Optional[threading.Thread] = None
 
     def setup(self) -> None:
         """Initialize all components of the debug panel.
@@ -33,16 +56,52 @@ class DebugPanel(Output):
         """
         for output in self.outputs:
             output.setup()
+        if self._executor is None:
+            self._executor = self.executor or ThreadPoolExecutor(
+                    max_workers=max(1, len(self.outputs)), thread_name_prefix="DebugPanel")
+        if self._blink_thread is None and self.direction_leds:
+            self._blink_thread = threading.Thread(
+                    target=self._run_blinks, name="DebugPanelBlink", daemon=True)
+            self._blink_thread.start()
 
     def off(self) -> None:
         """Cleans up and resets any local state and outputs."""
-        for output in self.outputs:
-            output.off()
+        if self._blink_thread is not None:
+            # Let any queued blinks finish before turning off the LEDs.
+            self._blinks.put(None)
+            self._blink_thread.join()
+            self._blink_thread = None
+        if self._executor is not None:
+            # A shared executor is shut down by its owner.
+            if self._executor is not self.executor:
+                self._executor.shutdown()
+            self._executor = None
+        self._last_status = None
+        for off in self._off_fns:
+            off()
 
     def output_status(self, status: Status) -> None:
-        """Updates the indicators and logs with the given status."""
-        for output in self.outputs:
-            output.output_status(status)
+        """Updates the indicators and logs with the given status.
+
+        Each output drives its own pins or file, so they're updated concurrently. A status equal
+        to the last one output is skipped, since the outputs already reflect it.
+        """
+        assert self._executor, "must call setup() to initialize"
+        with self._status_lock:
+            if status == self._last_status:
+                return
+            submit = self._executor.submit
+            futures = [submit(output_fn, status) for output_fn in self._output_fns]
+            for future in futures:
+                # Propagate any errors from the outputs.
+                future.result()
+            self._last_status = status
+
+    def _output_leds(self, output_fn: Callable[[Status], None], status: Status) -> None:
+        with self._led_lock:
+            self._led_status = status
+            if not self._blinking:
+                output_fn(status)
 
     def _blink(self, on: Callable, off: Callable,
                times: int, on_secs: float, off_secs: float) -> None:
@@ -52,32 +111,72 @@ class DebugPanel(Output):
             off()
             if i != times-1:
                 time.sleep(off_secs)
+        # Statuses output while blinking were overwritten by it, so output the next one in full.
+        with self._status_lock:
+            self._last_status = None
 
     @no_type_check
     def output_error(self, output: str) -> None:
-        assert self.position_display or self.buzzer, \
+        assert self.position_displays or self.buzzer, \
                 "position display or buzzer must be configured"
 
         def on():
-            if self.position_display:
-                self.position_display.show(output)
+            for position_display in self.position_displays:
+                position_display.show(output)
             if self.buzzer:
                 self.buzzer.play(ERROR_TONE_HZ)
 
         def off():
-            if self.position_display:
-                self.position_display.off()
+            for position_display in self.position_displays:
+                position_display.off()
             if self.buzzer:
                 self.buzzer.stop()
         self._blink(on, off, times=1, on_secs=1, off_secs=0.5)
 
-    @no_type_check
     def blink(self, times: int = 2, pause_secs: float = 0.2) -> None:
+        """Blinks the directional LEDs in the background, without blocking the caller.
+
+        Requests made while a blink is queued or running are coalesced into a single blink.
+        """
         assert self.direction_leds, "LEDs must be configured"
+        assert self._blink_thread, "must call setup() to initialize"
+        with self._led_lock:
+            self._blinking = True
+            self._blinks.put((times, pause_secs))
 
+    @no_type_check
+    def _run_blinks(self) -> None:
         def on() -> None:
-            self.direction_leds.on()
+            with self._led_lock:
+                for direction_leds in self.direction_leds:
+                    direction_leds.on()
 
         def off() -> None:
-            self.direction_leds.off()
-        self._blink(on, off, times=2, on_secs=0.2, off_secs=0.2)
+            with self._led_lock:
+                for direction_leds in self.direction_leds:
+                    direction_leds.off()
+
+        while True:
+            request = self._blinks.get()
+            if request is None:
+                return
+            times, pause_secs = request
+            # Merge any requests queued since, so back-to-back blinks play once.
+            while not self._blinks.empty():
+                pending = self._blinks.get_nowait()
+                if pending is None:
+                    # Play the merged blink, then stop.
+                    self._blinks.put(None)
+                    break
+                times, pause_secs = max(times, pending[0]), max(pause_secs, pending[1])
+            try:
+                self._blink(on, off, times=times, on_secs=pause_secs, off_secs=pause_secs)
+            except Exception:
+                _log.exception("Failed to blink the LEDs")
+            with self._led_lock:
+                if self._blinks.empty():
+                    # Done blinking, so show the latest status held back during the blink.
+                    self._blinking = False
+                    if self._led_status is not None:
+                        for direction_leds in self.direction_leds:
+                            direction_leds.output_status(self._led_status)
@@ -1,4 +1,4 @@
 from .button import Button, ToggleButton
 from .light_sensor import LightSensor
 from .power_monitor import VoltageMeter
-from .ultrasonic_ranging import DistanceSensor
+from .ultrasonic_ranging import DistanceSampler, DistanceSensor
@@ -1,17 +1,18 @@
 import gpiozero
+from gpiozero.pins import Factory
 from typing import Callable, List, Optional
 
 from plantmobile.common import Pin
 
 
 class Button(gpiozero.Button):
-    def __init__(self, pin: Pin):
-        super(Button, self).__init__(pin.id)
+    def __init__(self, pin: Pin, pin_factory: Optional[Factory] = None):
+        super(Button, self).__init__(pin.id, pin_factory=pin_factory)
 
 
 class ToggleButton(Button):
-    def __init__(self, pin: Pin):
-        super(Button, self).__init__(pin.id)
+    def __init__(self, pin: Pin, pin_factory: Optional[Factory] = None):
+        super(Button, self).__init__(pin.id, pin_factory=pin_factory)
         self._enabled = False
         self.when_pressed = self._toggle
         self._handlers: List[Callable] = []
@@ -5,10 +5,11 @@ from typing import Optional
 import adafruit_tsl2561  # type: ignore
 import board
 import busio
-import numpy as np
 from adafruit_tca9548a import TCA9548A  # type: ignore
 
-from plantmobile.common import get_diff_percent, Input, LuxReading
+from plantmobile.common import get_lux_stats, Input, LuxReading
+
+_log = logging.getLogger(__name__)
 
 
 DIFF_PERCENT_CUTOFF = 30
@@ -21,7 +22,7 @@ class TSL2561(adafruit_tsl2561.TSL2561):
         partno, revno = super(TSL2561, self).chip_id
         if partno == 0x4:
             # This needs to be overridden for off-brand TSL2561 sensors like HiLetgo.
-            logging.warning("Invalid partno 0x4 for TSL2561 chip. Passing fake partno into lib.")
+            _log.warning("Invalid partno 0x4 for TSL2561 chip. Passing fake partno into lib.")
             partno = 0x5
         return partno, revno
 
@@ -50,8 +51,8 @@ class LightSensor(Input):
         # May throw a ValueError if it's not connected.
         if self._outer_tsl is None:
             assert self._inner_tsl is None, "partially initialized state"
-            logging.info("Initializing light sensors with mux pins Outer: {}, Inner: {}".format(
-                self.outer_pin, self.inner_pin))
+            _log.info("Initializing light sensors with mux pins Outer: %s, Inner: %s",
+                      self.outer_pin, self.inner_pin)
             self._outer_tsl = TSL2561(LightSensor.get_mux()[self.outer_pin])
             self._inner_tsl = TSL2561(LightSensor.get_mux()[self.inner_pin])
 
@@ -62,7 +63,7 @@ class LightSensor(Input):
     @classmethod
     def get_mux(cls) -> TCA9548A:
         if cls._mux is None:
-            logging.info("Initializing i2c mux TCA9548A on SCL and SDA pins")
+            _log.info("Initializing i2c mux TCA9548A on SCL and SDA pins")
             # Create I2C bus as normal.
             i2c = busio.I2C(board.SCL, board.SDA)
             # Create the TCA9548A object and give it the I2C bus.
@@ -76,7 +77,5 @@ class LightSensor(Input):
         outer = self._outer_tsl.infrared
         inner = self._inner_tsl.infrared
         timestamp = datetime.now()
-        avg = int(np.mean((outer, inner)))
-        diff = inner - outer
-        diff_percent = get_diff_percent(outer, inner)
+        avg, diff, diff_percent = get_lux_stats(outer, inner)
         return LuxReading(outer, inner, avg, diff, diff_percent, timestamp)
@@ -1,9 +1,23 @@
 import logging
+import threading
+import time
+from typing import Optional, Tuple
 
 from adafruit_hcsr04 import HCSR04  # type: ignore
 
 from plantmobile.common import Component, Pin
 
+_log = logging.getLogger(__name__)
+
+# How long the sampler waits between distance readings while fresh samples are needed.
+SAMPLE_INTERVAL_SECS = 0.02
+# How long the sampler waits between distance readings otherwise.
+IDLE_SAMPLE_INTERVAL_SECS = 0.5
+# How long the sampler keeps the faster interval after a reader asks for a fresh sample.
+ACTIVE_SAMPLING_SECS = 1.0
+# How long a reader waits for a sample before reading the sensor itself.
+SAMPLE_WAIT_TIMEOUT_SECS = 1.0
+
 
 class DistanceSensor(Component):
 
@@ -34,10 +48,10 @@ class DistanceSensor(Component):
         try:
             self._prev_distance = self._sensor.distance
         except RuntimeError:
-            logging.warn("Failed to read distance. Defaulting to previously read value")
+            _log.warning("Failed to read distance. Defaulting to previously read value")
 
         if self._prev_distance is None:
-            logging.warn("Initializing first value to inf and retrying")
+            _log.warning("Initializing first value to inf and retrying")
             self._prev_distance = float("inf")
             return self.read()
         else:
@@ -45,3 +59,91 @@ class DistanceSensor(Component):
 
     def is_in_range(self) -> bool:
         return self.read() < self.threshold_cm
+
+
+class DistanceSampler(threading.Thread):
+    """Continually reads a distance sensor in the background.
+
+    Readers get the latest sample immediately, instead of blocking on the sensor's echo timeout.
+    The sensor is read every interval_secs while readers are asking for fresh samples (e.g. while
+    moving towards the edge), and every idle_interval_secs otherwise.
+    """
+
+    def __init__(self, sensor: DistanceSensor,
+                 interval_secs: float = SAMPLE_INTERVAL_SECS,
+                 idle_interval_secs: float = IDLE_SAMPLE_INTERVAL_SECS) -> None:
+        super(DistanceSampler, self).__init__(name="DistanceSampler", daemon=True)
+        self.sensor = sensor
+        self.interval_secs = interval_secs
+        self.idle_interval_secs = idle_interval_secs
+        # The latest (monotonic time, in range) sample.
+        self.latest: Optional[Tuple[float, bool]] = None
+        # Notified on each new sample.
+        self._sampled = threading.Condition()
+        # Held while reading the sensor, so a reader's fallback read can't overlap the sampler's.
+        self._sensor_lock = threading.Lock()
+        # Set to take the next sample right away, or to stop.
+        self._wake = threading.Event()
+        self._halted = False
+        # The monotonic time until which to sample at the faster interval.
+        self._active_until = float("-inf")
+
+    def run(self) -> None:
+        while not self._halted:
+            # Clear before sampling, so a wake requested mid-sample triggers another one.
+            self._wake.clear()
+            try:
+                with self._sensor_lock:
+                    sample = (time.monotonic(), self.sensor.is_in_range())
+            except Exception:
+                # Keep sampling, so a transient failure doesn't leave readers without samples.
+                _log.exception("Failed to sample the distance sensor")
+            else:
+                with self._sampled:
+                    self.latest = sample
+                    self._sampled.notify_all()
+            active = time.monotonic() < self._active_until
+            self._wake.wait(self.interval_secs if active else self.idle_interval_secs)
+
+    def stop(self) -> None:
+        self._halted = True
+        self._wake.set()
+        self.join()
+
+    def is_in_range(self, max_age_secs: Optional[float] = None) -> bool:
+        """Returns whether the latest sample is in range.
+
+        Waits for the first sample if needed, or for a new one if the latest is older than
+        max_age_secs. Asking for a max age also keeps the sampler at its faster interval for
+        ACTIVE_SAMPLING_SECS. If no sample arrives within SAMPLE_WAIT_TIMEOUT_SECS, the sensor is
+        read directly instead, once any read in progress on the sampler thread has finished.
+        Raises RuntimeError if the sensor stays busy for that long too.
+        """
+        def fresh() -> bool:
+            if self.latest is None:
+                return False
+            return max_age_secs is None or time.monotonic() - self.latest[0] <= max_age_secs
+
+        with self._sampled:
+            if max_age_secs is not None:
+                self._active_until = time.monotonic() + ACTIVE_SAMPLING_SECS
+                if not fresh():
+                    self._wake.set()
+            if self._sampled.wait_for(lambda: fresh() or (self._halted and bool(self.latest)),
+                                      SAMPLE_WAIT_TIMEOUT_SECS):
+                assert self.latest is not None
+                return self.latest[1]
+        _log.warning("No distance sample within %.1fs, reading the sensor directly",
+                     SAMPLE_WAIT_TIMEOUT_SECS)
+        locked = self._sensor_lock.acquire(timeout=SAMPLE_WAIT_TIMEOUT_SECS)
+        try:
+            latest = self.latest
+            if latest is not None and fresh():
+                # The sampler's read in progress finished in the meantime.
+                return latest[1]
+            if not locked:
+                raise RuntimeError("Distance sensor is stuck in a read on the sampler thread")
+            return self.sensor.is_in_range()
+        finally:
+            if locked:
+                self._sensor_lock.release()
@@ -1,33 +1,55 @@
+import logging
+import math
+import os
+import sys
+import threading
 import time
-from typing import Any, Callable, IO, List, Optional, Tuple
+from operator import attrgetter
+from typing import List, Optional, Tuple
 
 from texttable import Texttable  # type: ignore
 
 from plantmobile.common import LuxAggregator, Output, Status
 
+_log = logging.getLogger(__name__)
+
+
+def lux_band(lux: int) -> int:
+    """Buckets a lux value into half-octave bands."""
+    return int(math.log2(max(lux, 1)) * 2)
+
 
 class LightCsvLogger(Output):
     """Logs light data to csv in minutely intervals.
     Format of each line is "isotimestamp,outer_lux,inner_lux".
+
+    With a band_hysteresis, a minute is only logged once either lux has moved at least that many
+    lux_bands from the last logged line, which skips runs of near-identical readings.
     """
+    # Lines are written straight to the file descriptor, skipping the text IO layer. Each line is
+    # written as soon as its minute ends, so a stop or power cut loses at most the current minute.
+    OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_APPEND
 
-    def __init__(self, filename: str) -> None:
+    def __init__(self, filename: str, band_hysteresis: Optional[int] = None) -> None:
         self.filename = filename
-        self._file: Optional[IO] = None
+        self.band_hysteresis = band_hysteresis
+        # The (outer, inner) lux bands of the last logged line.
+        self._last_bands: Optional[Tuple[int, int]] = None
+        self._fd: Optional[int] = None
         self._cur_timestamp: Optional[str] = None
         self._cur_timestamp_luxes = LuxAggregator()
 
     def setup(self) -> None:
-        if self._file is None:
-            self._file = open(self.filename, 'a')
+        if self._fd is None:
+            self._fd = os.open(self.filename, LightCsvLogger.OPEN_FLAGS, 0o644)
 
     def off(self) -> None:
-        if self._file is not None:
-            self._file.close()
-            self._file = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
 
     def output_status(self, status: Status, force: bool = False) -> None:
-        assert self._file is not None, "must call setup() to initialize"
+        assert self._fd is not None, "must call setup() to initialize"
 
         # Timestamp truncated down to the minute
         timestamp = status.lux.timestamp.isoformat(timespec='minutes')
@@ -40,9 +62,9 @@ class LightCsvLogger(Output):
             assert self._cur_timestamp_luxes, "Timestamp with no lux data?"
             # We've buffered readings. Output them now.
             avg_lux = self._cur_timestamp_luxes.average()
-            log_line = "{},{},{}\n".format(self._cur_timestamp, avg_lux.outer, avg_lux.inner)
-            self._file.write(log_line)
-            self._file.flush()
+            if self._should_log(avg_lux.outer, avg_lux.inner):
+                os.write(self._fd, b"%s,%d,%d\n" % (
+                        self._cur_timestamp.encode(), avg_lux.outer, avg_lux.inner))
 
             # Reset data for the new timestamp.
             self._cur_timestamp = timestamp
@@ -52,24 +74,128 @@ class LightCsvLogger(Output):
         self._cur_timestamp_luxes.add(status.lux)
         return
 
+    def _should_log(self, outer: int, inner: int) -> bool:
+        if self.band_hysteresis is None:
+            return True
+        bands = (lux_band(outer), lux_band(inner))
+        if self._last_bands is not None and all(
+                abs(band - last_band) < self.band_hysteresis
+                for band, last_band in zip(bands, self._last_bands)):
+            return False
+        self._last_bands = bands
+        return True
+
+
+class BackgroundOutput(Output):
+    """Forwards statuses to another output on a background thread.
+
+    This keeps slow writes (e.g. to the SD card) from blocking the caller. Statuses are buffered in
+    a fixed ring of the given capacity (a power of 2); if the output falls that far behind, the
+    oldest statuses are overwritten.
+    """
+
+    def __init__(self, output: Output, capacity: int = 64) -> None:
+        assert capacity > 0 and capacity & (capacity - 1) == 0, "capacity must be a power of 2"
+        self.output = output
+        self.dropped = 0
+        # Each slot holds its (write index, status), so the reader can tell when a slot it's
+        # about to read has been overwritten.
+        self._ring: List[Optional[Tuple[int, Status]]] = [None] * capacity
+        self._mask = capacity - 1
+        # Total statuses written and read. Only the caller advances the write index, and only the
+        # background thread advances the read index.
+        self._write_index = 0
+        self._read_index = 0
+        self._pending = threading.Event()
+        self._halted = False
+        self._thread: Optional[threading.Thread] = None
+
+    def setup(self) -> None:
+        self.output.setup()
+        if self._thread is None:
+            self._halted = False
+            self._thread = threading.Thread(
+                    target=self._run, name="BackgroundOutput", daemon=True)
+            self._thread.start()
+
+    def off(self) -> None:
+        if self._thread is not None:
+            # Let the buffered statuses drain before turning off the output.
+            self._halted = True
+            self._pending.set()
+            self._thread.join()
+            self._thread = None
+        self.output.off()
+
+    def output_status(self, status: Status) -> None:
+        write_index = self._write_index
+        self._ring[write_index & self._mask] = (write_index, status)
+        self._write_index = write_index + 1
+        self._pending.set()
+
+    def _run(self) -> None:
+        capacity = len(self._ring)
+        while True:
+            self._pending.wait()
+            self._pending.clear()
+            # Check for halting first, so every status written before off() is drained below.
+            halted = self._halted
+            write_index = self._write_index
+            if write_index - self._read_index > capacity:
+                self._skip_to(write_index - capacity)
+            while self._read_index < write_index:
+                slot = self._ring[self._read_index & self._mask]
+                assert slot is not None
+                index, status = slot
+                if index != self._read_index:
+                    # The writer lapped the ring while the output was blocked, so skip to the
+                    # oldest status still in it, keeping the statuses in order.
+                    self._skip_to(self._write_index - capacity)
+                    continue
+                self._read_index += 1
+                try:
+                    self.output.output_status(status)
+                except Exception:
+                    _log.exception("Background output to %s failed", self.output)
+            if halted:
+                return
+
+    def _skip_to(self, read_index: int) -> None:
+        self.dropped += read_index - self._read_index
+        _log.debug("Dropped statuses for %s (%d total)", self.output, self.dropped)
+        self._read_index = read_index
+
 
 class StatusPrinter(object):
     """Prints statuses to stdout at a configurable interval."""
-    FIELDS: List[Tuple[str, Callable[[Status], Any]]] = [
-            ("name", lambda s: s.name),
-            ("outer_lux", lambda s: s.lux.outer),
-            ("inner_lux", lambda s: s.lux.inner),
-            ("average_lux", lambda s: s.lux.avg),
-            ("difference", lambda s: s.lux.diff),
-            ("diff_percent", lambda s: str(s.lux.diff_percent) + '%'),
-            ("position", lambda s: s.position),
-            ("region", lambda s: s.region.name),
-            ("motor voltage", lambda s: s.motor_voltage),
+    # The header and status attribute of each column.
+    FIELDS: List[Tuple[str, str]] = [
+            ("name", 'name'),
+            ("outer_lux", 'lux.outer'),
+            ("inner_lux", 'lux.inner'),
+            ("average_lux", 'lux.avg'),
+            ("difference", 'lux.diff'),
+            ("diff_percent", 'lux.diff_percent'),
+            ("position", 'position'),
+            ("region", 'region.name'),
+            ("motor voltage", 'motor_voltage'),
     ]
+    # The columns displayed as a percentage.
+    PERCENT_FIELDS = ("diff_percent",)
+
+    __slots__ = (
+        'print_interval', '_header', '_row_getter', '_percent_columns', '_header_widths',
+        '_was_forced', '_i', '_last_printed_time',
+    )
 
     def __init__(self, print_interval: float = 0) -> None:
         self.print_interval = print_interval
         self._header = [field[0] for field in StatusPrinter.FIELDS]
+        # Reads a whole row in one call, plus the minimum column widths, which don't change.
+        self._row_getter = attrgetter(*(field[1] for field in StatusPrinter.FIELDS))
+        self._percent_columns = tuple(i for i, field in enumerate(StatusPrinter.FIELDS)
+                                      if field[0] in StatusPrinter.PERCENT_FIELDS)
+        self._header_widths = tuple(len(h) for h in self._header)
         self._was_forced = False
         self.reset()
 
@@ -78,7 +204,8 @@ class StatusPrinter(object):
         self._last_printed_time = float("-inf")
 
     def output_status(self, status: Status, force: bool = False) -> None:
-        if not force and time.time() - self._last_printed_time < self.print_interval:
+        now = time.monotonic()
+        if not force and now - self._last_printed_time < self.print_interval:
             return
 
         table = Texttable()
@@ -86,15 +213,18 @@ class StatusPrinter(object):
         if self._i % 20 == 0 or (force ^ self._was_forced):
             table.header(self._header)
 
-        row = [field[1](status) for field in StatusPrinter.FIELDS]
+        row = list(self._row_getter(status))
+        for i in self._percent_columns:
+            row[i] = str(row[i]) + '%'
         table.add_row(row)
-        col_widths = [len(elm) if type(elm) is str else 0 for elm in row]
-        table.set_cols_width([max(len(h), w) for h, w in zip(self._header, col_widths)])
+        table.set_cols_width([max(w, len(elm)) if type(elm) is str else w
+                              for w, elm in zip(self._header_widths, row)])
 
         output = table.draw()
         if force:
             output = '\t' + output.replace('\n', '\n\t')
-        print(output)
-        self._last_printed_time = time.time()
+        # Write the whole table at once rather than going through print.
+        sys.stdout.write(output + '\n')
+        self._last_printed_time = now
         self._i += 1
         self._was_forced = force
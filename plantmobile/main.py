@@ -2,16 +2,20 @@
 
 import logging
 import sys
-from typing import Iterable, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
 
 import board
 import RPi.GPIO as GPIO
+from gpiozero.pins import Factory
 
+from plantmobile.common import Output
 from plantmobile.controller import (
         BatteryKeepAlive, ButtonHandler, control_loop, ShadowAvoider,
 )
 from plantmobile.debug_panel import DebugPanel
-from plantmobile.logger import LightCsvLogger, StatusPrinter
+from plantmobile.logger import BackgroundOutput, LightCsvLogger, StatusPrinter
 from plantmobile.input_device import Button, DistanceSensor, LightSensor, ToggleButton
 from plantmobile.motor import StepperMotor
 from plantmobile.output_device import (
@@ -35,6 +39,10 @@ PING_INTERVAL_SECS = 85
 PING_DURATION_SECS = 0.5
 # Whether to ping the battery periodically to keep it active.
 ENABLE_BATTERY_KEEP_ALIVE = False
+# How many half-octave lux bands the light must move before another CSV line is logged.
+CSV_LOG_BAND_HYSTERESIS = 1
+# How long a button level must be stable before pigpiod reports the edge, to debounce presses.
+BUTTON_GLITCH_FILTER_MICROS = 5000
 
 
 def setup(debug_panel: DebugPanel, platforms: Iterable[MobilePlatform]) -> List[MobilePlatform]:
@@ -50,51 +58,102 @@ def setup(debug_panel: DebugPanel, platforms: Iterable[MobilePlatform]) -> List[
         except ValueError as e:
             # This might happen if the car is disconnected.
             logging.exception(e)
-            logging.warning(
-                    "Failed to setup {} platform: may be disconnected.".format(platform.name))
+            logging.warning("Failed to setup %s platform: may be disconnected.", platform.name)
         else:
             working_platforms.append(platform)
     return working_platforms
 
 
-def cleanup(platforms: Iterable[MobilePlatform]) -> None:
-    for platform in platforms:
-        platform.off()
-    # GPIO cleanup handled by gpiozero.
-    # GPIO.cleanup()
+def button_pin_factory() -> Optional[Factory]:
+    """Returns a pigpio pin factory for the buttons, or None to use the gpiozero default.
 
+    The pigpiod daemon detects and timestamps button edges itself, so presses are delivered without
+    relying on Python-side edge detection. Requires the daemon to be running.
+    """
+    try:
+        from gpiozero.pins.pigpio import PiGPIOFactory
+        return PiGPIOFactory()
+    except (ImportError, OSError) as e:
+        logging.warning("pigpio unavailable, using the default pin factory for buttons: %s", e)
+        return None
 
-if __name__ == '__main__':
-    logging.basicConfig(level=logging.INFO)
-    STATUS_PRINTER = StatusPrinter(print_interval=PRINT_INTERVAL_SECS)
 
-    STEPPER_CAR = MobilePlatform(
+def filter_button_glitches(pin_factory: Optional[Factory], buttons: Iterable[Button]) -> None:
+    """Has pigpiod debounce the button pins, so bounces never reach the Python callbacks."""
+    if pin_factory is None:
+        return
+    for button in buttons:
+        pin_factory.connection.set_glitch_filter(button.pin.number, BUTTON_GLITCH_FILTER_MICROS)
+
+
+def build_stepper_car(executor: ThreadPoolExecutor) -> MobilePlatform:
+    """Constructs the stepper motor platform. Nothing touches the hardware until setup()."""
+    return MobilePlatform(
             name="StepperMobile",
             light_sensors=LightSensor(outer_pin=2, inner_pin=3),
             motor=StepperMotor(board.D27, board.D22, board.MOSI, board.MISO),
             distance_sensor=DistanceSensor(
                 trig_pin=board.D4, echo_pin=board.D17, threshold_cm=10, timeout=0.05),
+            executor=executor,
     )
 
-    ENABLE_AUTO_BUTTON = ToggleButton(board.CE1)
-    ENABLE_AUTO_LED = ToggledLed(LED(board.CE0), ENABLE_AUTO_BUTTON)
-    ENABLE_AUTO_BUTTON.toggle(enabled=True)
 
-    DEBUG_PANEL = DebugPanel(
+def build_debug_outputs(enable_auto_led: ToggledLed) -> Tuple[Output, ...]:
+    return (
             DirectionalLeds(LED(board.D20), LED(board.D12), DIFF_PERCENT_CUTOFF),
-            LightCsvLogger("data/car_sensor_log.csv"),
+            BackgroundOutput(LightCsvLogger("data/car_sensor_log.csv", CSV_LOG_BAND_HYSTERESIS)),
             LedBarGraphs(
                 data_pin=board.D23, latch_pin=board.D24, clock_pin=board.D25,
                 min_level=500, max_level=30000),
             LuxDiffDisplay(clock_pin=board.D6, data_pin=board.D13),
             PositionDisplay(clock_pin=board.D19, data_pin=board.D26),
-            ENABLE_AUTO_LED,
-            buzzer=TonalBuzzer(board.D18),
+            enable_auto_led,
     )
 
+
+def build_debug_panel(outputs: Tuple[Output, ...], executor: ThreadPoolExecutor) -> DebugPanel:
+    return DebugPanel(*outputs, buzzer=TonalBuzzer(board.D18), executor=executor)
+
+
+def cleanup(debug_panel: DebugPanel, platforms: Iterable[MobilePlatform],
+            executor: ThreadPoolExecutor) -> None:
+    for platform in platforms:
+        platform.off()
+    # Also drains any statuses queued for the background CSV logger.
+    debug_panel.off()
+    executor.shutdown()
+    # GPIO cleanup handled by gpiozero.
+    # GPIO.cleanup()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    STATUS_PRINTER = StatusPrinter(print_interval=PRINT_INTERVAL_SECS)
+
+    BUTTON_PIN_FACTORY = button_pin_factory()
+    ENABLE_AUTO_BUTTON = ToggleButton(board.CE1, BUTTON_PIN_FACTORY)
+    ENABLE_AUTO_LED = ToggledLed(LED(board.CE0), ENABLE_AUTO_BUTTON)
+    ENABLE_AUTO_BUTTON.toggle(enabled=True)
+
+    DEBUG_OUTPUTS = build_debug_outputs(ENABLE_AUTO_LED)
+    # The pool shared by the platform and debug panel: one thread per debug output, so they all
+    # update concurrently, plus one for the platform's voltage reads.
+    SHARED_EXECUTOR = ThreadPoolExecutor(
+            max_workers=len(DEBUG_OUTPUTS) + 1, thread_name_prefix="PlantMobile")
+    STEPPER_CAR = build_stepper_car(SHARED_EXECUTOR)
+    DEBUG_PANEL = build_debug_panel(DEBUG_OUTPUTS, SHARED_EXECUTOR)
+
+    OUTER_BUTTON = Button(board.D21, BUTTON_PIN_FACTORY)
+    INNER_BUTTON = Button(board.D16, BUTTON_PIN_FACTORY)
+    filter_button_glitches(BUTTON_PIN_FACTORY, [ENABLE_AUTO_BUTTON, OUTER_BUTTON, INNER_BUTTON])
+
+    # Lets button presses start a move without waiting for the next control loop iteration.
+    CONTROL_LOOP_WAKE = threading.Event()
+    # Toggling auto mode also takes effect on the next iteration, rather than after a full sleep.
+    ENABLE_AUTO_BUTTON.add_press_handler(CONTROL_LOOP_WAKE.set)
     button_handler = ButtonHandler(
         STEPPER_CAR, DEBUG_PANEL, STATUS_PRINTER,
-        outer_button=Button(board.D21), inner_button=Button(board.D16))
+        outer_button=OUTER_BUTTON, inner_button=INNER_BUTTON, wake=CONTROL_LOOP_WAKE)
     shadow_avoider = ShadowAvoider(
         STEPPER_CAR, DEBUG_PANEL, STATUS_PRINTER, ENABLE_AUTO_BUTTON, DIFF_PERCENT_CUTOFF)
     CONTROLLERS = [button_handler, shadow_avoider]
@@ -115,8 +174,9 @@ if __name__ == '__main__':
         print("No working platforms to run. Exiting.")
         sys.exit(1)
     try:
-        control_loop(working_platforms[0], DEBUG_PANEL, STATUS_PRINTER, CONTROLLERS)
+        control_loop(working_platforms[0], DEBUG_PANEL, STATUS_PRINTER, CONTROLLERS,
+                     wake=CONTROL_LOOP_WAKE)
     except KeyboardInterrupt:
         print("Stopping...")
     finally:
-        cleanup(working_platforms)
+        cleanup(DEBUG_PANEL, working_platforms, SHARED_EXECUTOR)
@@ -1,12 +1,44 @@
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from functools import partial
+from typing import Callable, Dict, Optional, Tuple
+
 import RPi.GPIO as GPIO
-from RpiMotorLib import RpiMotorLib  # type: ignore
 
 from plantmobile.common import Component, Pin, Rotation
 
+_log = logging.getLogger(__name__)
+
 # Suggested pause secs for a half step of the 28BYJ motor.
 PAUSE_SECS = 0.001
-# This type is a bit smoother, and supports a lower PAUSE_SECS than "full".
-STEP_TYPE = "half"
+# The half step coil sequence, which is a bit smoother and supports a lower PAUSE_SECS than full
+# steps. Each phase has one output per pin, in clockwise order.
+HALF_STEP_PHASES = (
+    (1, 0, 0, 0), (1, 1, 0, 0), (0, 1, 0, 0), (0, 1, 1, 0),
+    (0, 0, 1, 0), (0, 0, 1, 1), (0, 0, 0, 1), (1, 0, 0, 1),
+)
+# The phase sequence for each rotation, so a move doesn't re-derive the counter-clockwise order.
+ROTATION_PHASES = {
+    Rotation.CW: HALF_STEP_PHASES,
+    Rotation.CCW: HALF_STEP_PHASES[::-1],
+}
+# The memory-mapped BCM283x GPIO registers, and the offsets of the set and clear registers for
+# pins 0-31. Writing a pin mask to these drives all the motor pins with a single store.
+GPIO_MEM_PATH = '/dev/gpiomem'
+GPIO_MEM_SIZE = 0xB4
+GPSET0 = 0x1C
+GPCLR0 = 0x28
+# How long before each phase deadline to stop sleeping and busy-wait instead, for precise timing.
+SPIN_SECS = 0.0002
+# The CPU core reserved for the motor thread (ideally isolated from the scheduler via isolcpus).
+MOTOR_CPU = 3
+# The SCHED_FIFO priority of the motor thread, so stepping preempts regular processes.
+MOTOR_PRIORITY = 80
 
 
 class StepperMotor(Component):
@@ -14,29 +46,212 @@ class StepperMotor(Component):
 
     def __init__(self, pin1: Pin, pin2: Pin, pin3: Pin, pin4: Pin) -> None:
         self.pins = [pin.id for pin in (pin1, pin2, pin3, pin4)]
-        self._motor = RpiMotorLib.BYJMotor("Stepper", "28BYJ")
+        self._pin_mask = sum(1 << pin for pin in self.pins)
+        # The GPIO registers, when they can be mapped. Otherwise writes go through RPi.GPIO.
+        self._gpio_mem: Optional[mmap.mmap] = None
+        # The functions writing each phase, per rotation.
+        self._phase_writers: Dict[Rotation, Tuple[Callable[[], None], ...]] = {
+            rotation: tuple(partial(GPIO.output, self.pins, phase) for phase in phases)
+            for rotation, phases in ROTATION_PHASES.items()
+        }
 
     def setup(self) -> None:
         for pin in self.pins:
             GPIO.setup(pin, GPIO.OUT)
+        if self._gpio_mem is None and all(pin < 32 for pin in self.pins):
+            self._gpio_mem = _map_gpio_mem()
+            if self._gpio_mem is not None:
+                self._phase_writers = {
+                    rotation: tuple(self._register_writer(phase) for phase in phases)
+                    for rotation, phases in ROTATION_PHASES.items()
+                }
 
     def off(self) -> None:
         """Reset the motor to stopped."""
-        for pin in self.pins:
-            GPIO.output(pin, GPIO.LOW)
+        if self._gpio_mem is not None:
+            struct.pack_into('<I', self._gpio_mem, GPCLR0, self._pin_mask)
+        else:
+            GPIO.output(self.pins, GPIO.LOW)
 
     def all_on(self) -> None:
         """Set all the outputs of the motor to high. Only useful for lights.
 
         Warning: this drains a fair bit of current so use sparingly.
         """
-        for pin in self.pins:
-            GPIO.output(pin, GPIO.HIGH)
+        if self._gpio_mem is not None:
+            struct.pack_into('<I', self._gpio_mem, GPSET0, self._pin_mask)
+        else:
+            GPIO.output(self.pins, GPIO.HIGH)
+
+    def _register_writer(self, phase: Tuple[int, ...]) -> Callable[[], None]:
+        set_mask = sum(1 << pin for pin, on in zip(self.pins, phase) if on)
+        clear_mask = self._pin_mask & ~set_mask
+        mem, pack_into = self._gpio_mem, struct.pack_into
+        assert mem is not None, "GPIO registers must be mapped"
+
+        def write() -> None:
+            pack_into('<I', mem, GPSET0, set_mask)
+            pack_into('<I', mem, GPCLR0, clear_mask)
+        return write
 
     def move_steps(self, rotation: Rotation, steps: int = 1) -> None:
-        """Rotate the motor one period.
+        """Rotate the motor the given number of periods, then turn it off.
+
+        Note: each period is technically 4 steps for convenience of implementation."""
+        try:
+            self._step(rotation, steps)
+        finally:
+            self.off()
+
+    def run_while(self, rotation: Rotation, steps: int, on_move: Callable[[], bool]) -> None:
+        """Rotate the motor in moves of the given number of periods until on_move returns False.
+
+        on_move is called after each move. Unlike repeated calls to move_steps, the coils stay
+        energized between moves, and are only turned off at the end.
+        """
+        try:
+            while True:
+                self._step(rotation, steps)
+                if not on_move():
+                    return
+        finally:
+            self.off()
+
+    def _step(self, rotation: Rotation, steps: int) -> None:
+        writers = self._phase_writers[rotation]
+        # Bind the lookups used in the loop to locals, as this is the tightest loop in the program.
+        monotonic, sleep = time.monotonic, time.sleep
+        # Pace the phases against a deadline, so time spent writing doesn't add to each pause.
+        deadline = monotonic()
+        for _ in range(steps):
+            for write_phase in writers:
+                # Write all the coils of the phase at once.
+                write_phase()
+                deadline += PAUSE_SECS
+                delay = deadline - monotonic()
+                if delay > 0:
+                    # Sleeping alone tends to overshoot by a scheduler tick, so sleep until just
+                    # before the deadline and then spin for the rest.
+                    if delay > SPIN_SECS:
+                        sleep(delay - SPIN_SECS)
+                    while monotonic() < deadline:
+                        pass
+                else:
+                    # Running late. Don't rush the next phases to catch up, or the motor may skip.
+                    deadline -= delay
+
+
+def _map_gpio_mem() -> Optional[mmap.mmap]:
+    """Maps the GPIO registers, or returns None if they're unavailable (e.g. not on a Pi)."""
+    try:
+        fd = os.open(GPIO_MEM_PATH, os.O_RDWR | os.O_SYNC)
+    except OSError as e:
+        _log.info("Unable to open %s, writing motor pins via RPi.GPIO: %s", GPIO_MEM_PATH, e)
+        return None
+    try:
+        return mmap.mmap(fd, GPIO_MEM_SIZE)
+    except OSError as e:
+        _log.warning("Unable to map %s, writing motor pins via RPi.GPIO: %s", GPIO_MEM_PATH, e)
+        return None
+    finally:
+        os.close(fd)
+
+
+class MotorJob(object):
+    """A request for the MotorWorker to repeatedly move the motor until stopped.
+
+    The motor moves in units of the given steps, up to max_moves times. After each move, on_move is
+    called and the job ends early if it returns False. It also ends once the optional cancel event
+    is set, e.g. directly from an input callback.
+    """
+
+    def __init__(self, rotation: Rotation, steps: int, max_moves: int,
+                 on_move: Callable[[], bool], cancel: Optional[threading.Event] = None) -> None:
+        self.rotation = rotation
+        self.steps = steps
+        self.max_moves = max_moves
+        self.on_move = on_move
+        self.cancel = cancel
+        # The number of completed moves.
+        self.moves = 0
+        self._stop = threading.Event()
+        self._done = threading.Event()
+
+    def stop(self) -> None:
+        """Requests the job to stop after the in-progress move."""
+        self._stop.set()
+
+    def stopped(self) -> bool:
+        return self._stop.is_set() or (self.cancel is not None and self.cancel.is_set())
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits for the job to finish. Returns whether it's done."""
+        return self._done.wait(timeout)
+
+    def _finish(self) -> None:
+        self._done.set()
+
+
+class MotorWorker(threading.Thread):
+    """Runs motor jobs on a dedicated thread.
+
+    This keeps the interval between steps independent of the sensor reads and outputs happening on
+    the main thread. When permitted, the thread is pinned to MOTOR_CPU with real-time scheduling.
+    """
+
+    def __init__(self, motor: StepperMotor,
+                 cpu: Optional[int] = MOTOR_CPU, priority: int = MOTOR_PRIORITY) -> None:
+        super(MotorWorker, self).__init__(name="MotorWorker", daemon=True)
+        self.motor = motor
+        self.cpu = cpu
+        self.priority = priority
+        self._jobs: "queue.Queue[Optional[MotorJob]]" = queue.Queue()
+
+    def submit(self, job: MotorJob) -> MotorJob:
+        self._jobs.put(job)
+        return job
+
+    def stop(self) -> None:
+        """Stops the thread once any queued jobs have finished."""
+        self._jobs.put(None)
+        self.join()
+
+    def run(self) -> None:
+        self._set_realtime()
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            try:
+                self._run_job(job)
+            except Exception:
+                _log.exception("Motor job failed after %d moves", job.moves)
+            finally:
+                job._finish()
+
+    def _run_job(self, job: MotorJob) -> None:
+        def on_move() -> bool:
+            job.moves += 1
+            return job.on_move() and job.moves < job.max_moves and not job.stopped()
+
+        if job.moves < job.max_moves and not job.stopped():
+            self.motor.run_while(job.rotation, job.steps, on_move)
 
-        Note: this is technically 4 steps for convenience of implementation."""
-        self._motor.motor_run(
-                self.pins, wait=PAUSE_SECS, steps=steps,
-                ccwise=rotation is Rotation.CCW, steptype=STEP_TYPE)
+    def _set_realtime(self) -> None:
+        # These are Linux-only and the scheduler change requires root, so treat them as best-effort.
+        # They're attempted separately, so e.g. a board without the CPU still gets the priority.
+        try:
+            if self.cpu is not None:
+                if self.cpu in os.sched_getaffinity(0):
+                    os.sched_setaffinity(0, {self.cpu})
+                else:
+                    _log.info("CPU %d unavailable, not pinning the motor thread", self.cpu)
+        except (AttributeError, OSError) as e:
+            _log.warning("Unable to pin the motor thread to CPU %s: %s", self.cpu, e)
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.priority))
+        except (AttributeError, OSError) as e:
+            _log.warning("Unable to set real-time scheduling for the motor thread: %s", e)
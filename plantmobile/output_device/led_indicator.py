@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Optional
+from typing import Optional, Tuple
 import logging
 
 import gpiozero
@@ -9,6 +9,10 @@ import tm1637   # type: ignore
 from plantmobile.common import Output, Pin, Status
 from plantmobile.input_device import ToggleButton
 
+# These outputs update on every status poll, including while the motor is moving, so the debug logs
+# are guarded to skip building their arguments when debug logging is off.
+_log = logging.getLogger(__name__)
+
 
 class LED(gpiozero.LED):
     def __init__(self, pin: Pin) -> None:
@@ -37,21 +41,25 @@ class ToggledLed(LedIndicator):
         self._led = led
         button.add_press_handler(self.update)
         self._button = button
+        # Whether the LED was last turned on, to skip unchanged writes.
+        self._lit: Optional[bool] = None
 
     def _output_status(self, status: Status) -> None:
         self.update()
 
     def off(self) -> None:
-        self._led.off()
+        self._set_lit(False)
 
     def setup(self) -> None:
-        pass
+        self._lit = None
 
     def update(self) -> None:
-        if self._button.enabled():
-            self._led.on()
-        else:
-            self._led.off()
+        self._set_lit(self._button.enabled())
+
+    def _set_lit(self, lit: bool) -> None:
+        if lit != self._lit:
+            self._led.value = lit
+            self._lit = lit
 
 
 class DirectionalLeds(LedIndicator):
@@ -60,35 +68,39 @@ class DirectionalLeds(LedIndicator):
         self.outer_led = outer_led
         self.inner_led = inner_led
         self.diff_percent_cutoff = diff_percent_cutoff
+        # The last (outer, inner) state written to the LEDs, to skip unchanged writes.
+        self._lit: Optional[Tuple[bool, bool]] = None
 
     def setup(self) -> None:
-        pass
+        self._lit = None
 
     def on(self) -> None:
-        self.outer_led.on()
-        self.inner_led.on()
+        self._set_lit(True, True)
 
     def off(self) -> None:
         """Reset the LEDs to off."""
-        self.outer_led.off()
-        self.inner_led.off()
+        self._set_lit(False, False)
+
+    def _set_lit(self, outer_on: bool, inner_on: bool) -> None:
+        if (outer_on, inner_on) == self._lit:
+            return
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug("lighting leds (outer: %s, inner: %s)", outer_on, inner_on)
+        self.outer_led.value = outer_on
+        self.inner_led.value = inner_on
+        self._lit = (outer_on, inner_on)
 
     def _output_status(self, status: Status) -> None:
         lux = status.lux
         # If one sensor is much brighter than the other, then light up the corresponding LED.
         if abs(lux.diff_percent) >= self.diff_percent_cutoff:
             if lux.outer > lux.inner:
-                logging.debug("lighting outer led")
-                self.outer_led.on()
-                self.inner_led.off()
+                self._set_lit(True, False)
             else:
                 assert lux.outer < lux.inner, "inconsistent lux reading"
-                logging.debug("lighting inner led")
-                self.inner_led.on()
-                self.outer_led.off()
+                self._set_lit(False, True)
         else:
-            self.inner_led.off()
-            self.outer_led.off()
+            self._set_lit(False, False)
 
 
 class DigitDisplay(LedIndicator):
@@ -98,9 +110,12 @@ class DigitDisplay(LedIndicator):
         self._display = tm1637.TM1637(clk=clock_pin.id, dio=data_pin.id)
         # The brightness of the display, from 0-7.
         self.brightness = brightness
+        # The segments last written to the display, or None if unknown.
+        self._segments: Optional[bytes] = None
 
     def setup(self) -> None:
         self._display.brightness(self.brightness)
+        self._segments = None
         self.off()
 
     def _output_status(self, status: Status) -> None:
@@ -113,17 +128,33 @@ class DigitDisplay(LedIndicator):
 
     def off(self) -> None:
         """Reset the display to an empty state."""
-        self._display.show("    ")
+        self._show("    ")
 
     def output_number(self, num: Optional[int]) -> None:
         if num is not None:
-            self._display.number(num)
+            # Same formatting as TM1637.number, which clips to 4 digits.
+            self._show("{0: >4d}".format(max(-999, min(num, 9999))))
         else:
-            self._display.show("    ")
+            self._show("    ")
 
     def show(self, output: str) -> None:
         assert len(output) == 4, "output must be 4 characters"
-        self._display.show(output)
+        self._show(output)
+
+    def _show(self, output: str) -> None:
+        """Shows the output, only writing the digits that changed since the last write."""
+        segments = bytes(self._display.encode_string(output))
+        if self._segments is None:
+            self._display.write(segments)
+        else:
+            changed = [i for i, (old, new) in enumerate(zip(self._segments, segments))
+                       if old != new]
+            if not changed:
+                return
+            # Write the span of changed digits in a single transfer.
+            first, last = changed[0], changed[-1]
+            self._display.write(segments[first:last+1], first)
+        self._segments = segments
 
 
 class LuxDiffDisplay(DigitDisplay):
@@ -159,12 +190,13 @@ class LedBarGraphs(LedIndicator):
         self.max_level = max_level
         self.num_graphs = num_graphs
         self.levels_per_led = (max_level - min_level) / (num_leds - 1)
+        # The led levels last shifted out, to skip rewriting an unchanged display.
+        self._led_levels: Optional[Tuple[int, ...]] = None
 
     def setup(self) -> None:
-        logging.info(
-                "init {} graphs with {} leds, min {}, max {}, and {:.2f} levels per led".format(
-                    self.num_graphs, self.num_leds, self.min_level,
-                    self.max_level, self.levels_per_led))
+        _log.info(
+                "init %d graphs with %d leds, min %d, max %d, and %.2f levels per led",
+                self.num_graphs, self.num_leds, self.min_level, self.max_level, self.levels_per_led)
 
         # Prepare the pin channels for output.
         GPIO.setup(self.data_pin, GPIO.OUT)
@@ -172,6 +204,7 @@ class LedBarGraphs(LedIndicator):
         GPIO.setup(self.clock_pin, GPIO.OUT)
         # Initialize output to nothing. This resets the graph in case it was
         # partially set and validates that the basic IO is working.
+        self._led_levels = None
         self.set_levels(*[0]*self.num_graphs)
 
     # Set led values for one graph.
@@ -179,12 +212,11 @@ class LedBarGraphs(LedIndicator):
         assert led_level <= self.num_leds, \
                 "led_level {} higher than num leds {}".format(led_level, self.num_leds)
         # Keep all leds on up to and not including the level.
-        output_bits = [0]*(self.num_leds - led_level) + [1]*led_level
-        for led_on in output_bits:
-            # Prepare shift register for input.
-            GPIO.output(self.clock_pin, GPIO.LOW)
-            # Led bit sent on data wire.
-            GPIO.output(self.data_pin, GPIO.HIGH if led_on else GPIO.LOW)
+        output_bits = [GPIO.LOW]*(self.num_leds - led_level) + [GPIO.HIGH]*led_level
+        clock_and_data = (self.clock_pin, self.data_pin)
+        for led_bit in output_bits:
+            # Prepare shift register for input, with the led bit sent on the data wire.
+            GPIO.output(clock_and_data, (GPIO.LOW, led_bit))
             # Set led bit and shift to next register.
             GPIO.output(self.clock_pin, GPIO.HIGH)
         # Keep clock pin low.
@@ -200,17 +232,22 @@ class LedBarGraphs(LedIndicator):
     def set_levels(self, *levels: int) -> None:
         """Updates the bar graph with the levels specified, one per graph."""
         assert len(levels) == self.num_graphs, "call set_levels with one level per graph"
+        led_levels = tuple(self._get_leds_for_level(level) for level in levels)
+        if led_levels == self._led_levels:
+            return
+        debug = _log.isEnabledFor(logging.DEBUG)
         GPIO.output(self.latch_pin, GPIO.LOW)   # Prepare the shift registers for input
-        for i, level in enumerate(levels):
-            led_level = self._get_leds_for_level(level)
-            logging.debug("setting output of Graph{} to level {}/{} ({}/{} leds)".format(
-                          i, level, self.max_level, led_level, self.num_leds))
+        for i, (level, led_level) in enumerate(zip(levels, led_levels)):
+            if debug:
+                _log.debug("setting output of Graph%d to level %d/%d (%d/%d leds)",
+                           i, level, self.max_level, led_level, self.num_leds)
             self._set_leds(led_level)
         GPIO.output(self.latch_pin, GPIO.HIGH)  # Latch the output to the latest register values.
         GPIO.output(self.latch_pin, GPIO.LOW)   # Keep latch pin low.
+        self._led_levels = led_levels
 
     def off(self) -> None:
-        logging.debug("Resetting graphs to empty...")
+        _log.debug("Resetting graphs to empty...")
         self.set_levels(*[0]*self.num_graphs)
 
     def _output_status(self, status: Status) -> None:
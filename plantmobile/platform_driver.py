@@ -1,18 +1,45 @@
 import logging
+import threading
 import time
-from typing import Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
 
-from plantmobile.common import Component, Direction, Region, Status
-from plantmobile.input_device import DistanceSensor, LightSensor, VoltageMeter
-from plantmobile.motor import StepperMotor
+from plantmobile.common import Component, Direction, LuxReading, Region, Rotation, Status
+from plantmobile.input_device import DistanceSampler, DistanceSensor, LightSensor, VoltageMeter
+from plantmobile.motor import MotorJob, MotorWorker, StepperMotor
 
-# Number of steps in a single movement unit between sensor checks.
+_log = logging.getLogger(__name__)
+
+# Number of steps in a single movement unit, which is also the unit of position.
 STEPS_PER_MOVE = 13
+# How often to check the sensors while the motor worker is moving.
+MOVE_POLL_SECS = 0.02
+# How long sensor readings are reused, so statuses polled in quick succession share one read.
+SENSOR_CACHE_SECS = 0.1
+# The oldest distance sample accepted when checking for the outer edge.
+EDGE_CHECK_MAX_AGE_SECS = 0.15
+# Outer edge drift of at least this many positions is logged as a warning.
+DRIFT_WARNING_THRESHOLD = 10
+# The positions of the edges, resolved once for the position checks.
+OUTER_EDGE_POSITION: int = Region.OUTER_EDGE.value
+INNER_EDGE_POSITION: int = Region.INNER_EDGE.value
 # A voltage reading below this will abort motor movement and display an error.
 MOTOR_VOLTAGE_CUTOFF = 4.0
 # The max distance to travel, with a buffer to account for imprecision.
 MAX_DISTANCE = int(Region.size() * 1.1)
 
+# The parameters of a move that are fixed by its direction: the motor rotation, the edge at which
+# it stops, and whether to cross-check that edge with the distance sensor in case we've drifted.
+MoveParams = NamedTuple('MoveParams', [
+    ('rotation', Rotation), ('edge', Region), ('force_edge_check', bool)])
+MOVE_PARAMS: Dict[Direction, MoveParams] = {
+    direction: MoveParams(
+        rotation=direction.motor_rotation,
+        edge=direction.extreme_edge,
+        force_edge_check=direction is Direction.OUTER)
+    for direction in Direction
+}
+
 
 class BatteryError(Exception):
     """Indicates the platform is unable to move due to a battery voltage issue."""
@@ -21,18 +48,42 @@ class BatteryError(Exception):
 class MobilePlatform(Component):
     """The main driver for a single platform, wrapping up all sensors, actuators, and outputs."""
 
+    __slots__ = (
+        'name', 'light_sensors', 'motor', 'voltage_reader', 'distance_sensor', 'position',
+        '_position_lock', '_position_resets', '_motor_worker', '_distance_sampler', '_sensor_cache',
+        'executor', '_voltage_executor',
+    )
+
     def __init__(self,
                  name: str,
                  light_sensors: LightSensor,
                  motor: Optional[StepperMotor] = None,
                  distance_sensor: Optional[DistanceSensor] = None,
-                 voltage_reader: Optional[VoltageMeter] = None) -> None:
+                 voltage_reader: Optional[VoltageMeter] = None,
+                 executor: Optional[ThreadPoolExecutor] = None) -> None:
+        """
+        param executor:
+            A thread pool shared with other components for concurrent sensor reads. If not given,
+            the platform creates its own as needed.
+        """
         self.name = name
         self.light_sensors = light_sensors
         self.motor = motor
         self.voltage_reader = voltage_reader
         self.distance_sensor = distance_sensor
+        self.executor = executor
         self.position: Optional[int] = None
+        # Guards position updates, which happen on both the main thread and the motor thread.
+        self._position_lock = threading.Lock()
+        # The number of times the position was reset at the outer edge, so a move in flight during
+        # a reset knows its position update is stale.
+        self._position_resets = 0
+        self._motor_worker: Optional[MotorWorker] = None
+        self._distance_sampler: Optional[DistanceSampler] = None
+        # The latest (monotonic time, lux, motor voltage) sensor readings.
+        self._sensor_cache: Optional[Tuple[float, LuxReading, Optional[float]]] = None
+        # Reads the voltage concurrently with the light sensors.
+        self._voltage_executor: Optional[ThreadPoolExecutor] = None
 
     def setup(self) -> None:
         """Initialize all components of the platform.
@@ -44,13 +95,33 @@ class MobilePlatform(Component):
         self.light_sensors.setup()
         if self.motor:
             self.motor.setup()
+            if self._motor_worker is None:
+                self._motor_worker = MotorWorker(self.motor)
+                self._motor_worker.start()
         if self.distance_sensor:
             self.distance_sensor.setup()
+            if self._distance_sampler is None:
+                self._distance_sampler = DistanceSampler(self.distance_sensor)
+                self._distance_sampler.start()
         if self.voltage_reader:
             self.voltage_reader.setup()
+            if self._voltage_executor is None:
+                self._voltage_executor = self.executor or ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="{}Voltage".format(self.name))
 
     def off(self) -> None:
         """Cleans up and resets any local state and outputs."""
+        if self._motor_worker:
+            self._motor_worker.stop()
+            self._motor_worker = None
+        if self._distance_sampler:
+            self._distance_sampler.stop()
+            self._distance_sampler = None
+        if self._voltage_executor:
+            # A shared executor is shut down by its owner.
+            if self._voltage_executor is not self.executor:
+                self._voltage_executor.shutdown()
+            self._voltage_executor = None
         if self.motor:
             self.motor.off()
 
@@ -59,29 +130,50 @@ class MobilePlatform(Component):
 
         force_edge_check: whether to check the distance sensor to verify the edge position.
         """
+        lux, motor_voltage = self._read_sensors()
         return Status(
                 name=self.name,
-                lux=self.light_sensors.read(),
-                motor_voltage=self.voltage_reader.read() if self.voltage_reader else None,
+                lux=lux,
+                motor_voltage=motor_voltage,
                 position=self.position,
                 region=self.get_region(force_edge_check))
 
+    def _read_sensors(self) -> Tuple[LuxReading, Optional[float]]:
+        """Reads the light and voltage sensors, reusing readings up to SENSOR_CACHE_SECS old."""
+        now = time.monotonic()
+        if self._sensor_cache is None or now - self._sensor_cache[0] >= SENSOR_CACHE_SECS:
+            if self.voltage_reader:
+                assert self._voltage_executor, "voltage reader must be set up"
+                # Overlap the ADC read with the light sensor reads rather than adding to them.
+                voltage_future = self._voltage_executor.submit(self.voltage_reader.read)
+                lux = self.light_sensors.read()
+                motor_voltage: Optional[float] = voltage_future.result()
+            else:
+                lux = self.light_sensors.read()
+                motor_voltage = None
+            self._sensor_cache = (now, lux, motor_voltage)
+        _, lux, motor_voltage = self._sensor_cache
+        return lux, motor_voltage
+
     def get_region(self, force_edge_check: bool = False) -> Region:
         """Get the region of the table in which the platform is located.
 
         Note: upon intialization when the position is unknown, we might report
         being in MID while we're actually at the inner edge.
         """
-        assert self.distance_sensor, "distance sensor must be configured"
+        assert self._distance_sampler, "distance sensor must be configured and set up"
 
-        if self.position == Region.INNER_EDGE.value:
+        position = self.position
+        if position == INNER_EDGE_POSITION:
             return Region.INNER_EDGE
 
-        at_outer_edge = self.position is Region.OUTER_EDGE.value
-        if self.position is None or force_edge_check:
-            at_outer_edge = not self.distance_sensor.is_in_range()
+        at_outer_edge = position == OUTER_EDGE_POSITION
+        if position is None or force_edge_check:
+            # Always require a fresh sample, as the position may have drifted arbitrarily far. This
+            # also keeps the sampler at its faster rate for the duration of an outward move.
+            at_outer_edge = not self._distance_sampler.is_in_range(EDGE_CHECK_MAX_AGE_SECS)
             if at_outer_edge:
-                logging.info("At outer edge. Setting position to zero.")
+                _log.info("At outer edge. Setting position to zero.")
                 self._reset_pos_to_outer_edge()
         if at_outer_edge:
             return Region.OUTER_EDGE
@@ -93,11 +185,24 @@ class MobilePlatform(Component):
     def _reset_pos_to_outer_edge(self) -> None:
         """Reset the current internal position to be 0, i.e. the OUTER_EDGE."""
         if self.position is None:
-            logging.info("Initializing edge position to {}".format(Region.OUTER_EDGE))
-        elif self.position != Region.OUTER_EDGE.value:
-            log = logging.info if abs(self.position) < 10 else logging.warning
-            log("Resetting outer edge position (drift: {})".format(self.position))
-        self.position = Region.OUTER_EDGE.value
+            _log.info("Initializing edge position to %s", Region.OUTER_EDGE)
+        elif self.position != OUTER_EDGE_POSITION:
+            drifted_far = abs(self.position) >= DRIFT_WARNING_THRESHOLD
+            level = logging.WARNING if drifted_far else logging.INFO
+            _log.log(level, "Resetting outer edge position (drift: %s)", self.position)
+        with self._position_lock:
+            self.position = OUTER_EDGE_POSITION
+            self._position_resets += 1
+
+    def _update_position(self, direction: Direction) -> bool:
+        """Tracks a completed move of the motor worker. Must be called with _position_lock held.
+
+        Returns whether the motor may keep moving, i.e. it hasn't reached the inner edge.
+        """
+        # Update the internal position, if it's already been intialized.
+        if self.position is not None:
+            self.position += direction.value
+        return not (direction is Direction.INNER and self.position == INNER_EDGE_POSITION)
 
     def voltage_low(self, status: Status) -> bool:
         """Returns whether the motor voltage is too low to actuate."""
@@ -106,39 +211,76 @@ class MobilePlatform(Component):
     def move_direction(self,
                        direction: Direction,
                        should_continue: Callable[[Status], bool],
-                       steps: Optional[int] = None) -> int:
-        assert self.motor, "motor must be configured"
+                       steps: Optional[int] = None,
+                       cancel: Optional[threading.Event] = None) -> int:
+        """Moves towards the direction until stopped, the edge is reached, or after max steps.
+
+        The motor runs on the motor worker thread, while this thread keeps polling the status.
+        Setting the optional cancel event stops the motor after its current move, without waiting
+        for the next poll.
+        Returns the number of movement units travelled.
+        """
+        assert self.motor and self._motor_worker, "motor must be configured and set up"
 
-        logging.info("starting sequence move towards %s", direction)
-        stop_fmt = "stopping sequence move towards {}: %s (%d steps)".format(direction)
+        _log.info("starting sequence move towards %s", direction)
+        stop_fmt = "stopping sequence move towards %s: %s (%d steps)"
 
         # Move at most the region size, with a small error buffer to bias towards the outer edge.
         max_distance = steps or MAX_DISTANCE
+        rotation, edge, force_edge_check = MOVE_PARAMS[direction]
 
-        for steps in range(max_distance+1):
-            # When moving towards the outer edge, cross-check with the sensor in case we've drifted.
-            status = self.get_status(force_edge_check=direction is Direction.OUTER)
-
-            if self.voltage_low(status):
-                logging.error(stop_fmt, "insufficient voltage", steps)
-                raise BatteryError()
-            elif not should_continue(status):
-                logging.info(stop_fmt, "stopped", steps)
-                break
-            elif status.region is direction.extreme_edge:
-                logging.info(stop_fmt, "at edge", steps)
-                break
-            elif steps == max_distance:
-                # Terminate with an explicit check to run edge check first.
-                if steps == MAX_DISTANCE:
-                    logging.warning(stop_fmt, "travelled max distance without reaching edge", steps)
-                break
-            else:
-                self.motor.move_steps(direction.motor_rotation, STEPS_PER_MOVE)
-                # Update the internal position, if it's already been intialized.
-                if self.position is not None:
-                    self.position += direction.value
-        return steps
+        # The moves applied to the position. A move that completes after the outer edge was found
+        # isn't applied, as the reset position already accounts for it.
+        moved = 0
+        resets = self._position_resets
+
+        def on_move() -> bool:
+            nonlocal moved
+            with self._position_lock:
+                if self._position_resets != resets:
+                    return False
+                moved += 1
+                return self._update_position(direction)
+
+        # The (log level, reason) the move stopped for, logged once the motor has stopped.
+        stop: Optional[Tuple[int, str]] = None
+        job: Optional[MotorJob] = None
+        try:
+            while True:
+                # Check completion before reading the status, so the status reflects the final move.
+                finished = job is not None and job.done()
+                status = self.get_status(force_edge_check)
+
+                if self.voltage_low(status):
+                    stop = (logging.ERROR, "insufficient voltage")
+                    raise BatteryError()
+                elif (cancel is not None and cancel.is_set()) or not should_continue(status):
+                    stop = (logging.INFO, "stopped")
+                    break
+                elif status.region is edge:
+                    stop = (logging.INFO, "at edge")
+                    break
+                elif finished:
+                    # Terminate after the final status check, so the edge check runs first.
+                    if moved == MAX_DISTANCE:
+                        stop = (logging.WARNING, "travelled max distance without reaching edge")
+                    break
+                elif job is None:
+                    job = self._motor_worker.submit(MotorJob(
+                        rotation, STEPS_PER_MOVE, max_distance, on_move, cancel))
+                assert job is not None
+                job.wait(MOVE_POLL_SECS)
+        finally:
+            if job is not None:
+                job.stop()
+                job.wait()
+            # Readings taken during the move don't reflect the new position.
+            self._sensor_cache = None
+            if stop is not None:
+                # Log after the motor has stopped, so the count includes any move in flight.
+                level, reason = stop
+                _log.log(level, stop_fmt, direction, reason, moved)
+        return moved
 
     def ping_motor(self, status: Status, duration_secs: float) -> None:
         if self.voltage_low(status):
@@ -18,11 +18,11 @@ if __name__ == '__main__':
         graphs.setup()
         while True:
             for i in range(0, max_level+2):
-                logging.info("setting level to ({}, {})".format(i, max_level-i))
+                logging.info("setting level to (%d, %d)", i, max_level-i)
                 graphs.set_levels(i, max_level-i)
                 time.sleep(.5)
             for i in range(0, max_level+2):
-                logging.info("Setting level to ({}, {})".format(max_level-i, i))
+                logging.info("Setting level to (%d, %d)", max_level-i, i)
                 graphs.set_levels(max_level-i, i)
                 time.sleep(.5)
     except KeyboardInterrupt:  # Press ctrl-c to end the program.
@@ -27,16 +27,19 @@ def control_loop(
         red_button: Button, red_led: LED) -> NoReturn:
     position = 0
     while True:
-        if red_button.is_pressed and blue_button.is_pressed:
+        # Read each button once per iteration.
+        red_pressed = red_button.is_pressed
+        blue_pressed = blue_button.is_pressed
+        if red_pressed and blue_pressed:
             print("position is", position)
             time.sleep(1)
             position = 0
-        elif blue_button.is_pressed:
+        elif blue_pressed:
             blue_led.on()
             red_led.off()
             motor.move_steps(Rotation.CCW, STEPS_PER_MOVE)
             position -= 1
-        elif red_button.is_pressed:
+        elif red_pressed:
             red_led.on()
             blue_led.off()
             motor.move_steps(Rotation.CW, STEPS_PER_MOVE)